@@ -16,6 +16,11 @@ DEFAULT_USERS_CSV = BASE_DIR / "data_sample" / "users_sample.csv"
 DEFAULT_PAYMENTS_CSV = BASE_DIR / "data_sample" / "payments_sample.csv"
 DEFAULT_REPORT_PATH = BASE_DIR / "reports" / "weekly_kpi_report.xlsx"
 
+# Parquet-кэш исходных CSV (партиции по году/месяцу, нужен pyarrow).
+# Первый запуск конвертирует CSV, последующие читают только нужные месяцы.
+PARQUET_CACHE_DIR = BASE_DIR / "cache"
+ENABLE_PARQUET_CACHE = False
+
 # Telegram
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
@@ -9,30 +9,279 @@ users:
 
 payments:
     payment_id,user_id,amount,currency,paid_at
+
+Обе таблицы возвращаются отсортированными по времени события
+(registered_at / paid_at) — transform.compute_kpis режет период
+бинарным поиском по этой колонке.
 """
 
+import hashlib
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 
 import pandas as pd
 
+# Формат дат в выгрузках (ISO 8601: "2025-03-10" или "2025-03-10 12:34:56").
+# Явный формат избавляет read_csv от медленного угадывания формата по строкам.
+DATE_FORMAT = "ISO8601"
+
+# Явные типы колонок, чтобы не тратить время на их вывод.
+# Низкокардинальные строковые колонки (source, currency) храним как category.
+USERS_DTYPES = {"user_id": "int64", "source": "category"}
+PAYMENTS_DTYPES = {"user_id": "int64", "amount": "float64", "currency": "category"}
+
+
+# Сколько строк CSV читать за раз при загрузке только нужного периода
+CHUNK_SIZE = 1_000_000
+
+# Колонки партиционирования Parquet-кэша
+PARTITION_COLS = ["year", "month"]
+# Файл-метка с mtime исходного CSV, по которому собран кэш
+_CACHE_MARKER = "_source_mtime"
 
-def load_users(path: str | Path) -> pd.DataFrame:
-    df = pd.read_csv(path)
-    df["registered_at"] = pd.to_datetime(df["registered_at"])
-    return df
 
+def _period_bounds(
+    start_date: pd.Timestamp, end_date: pd.Timestamp
+) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """Полуинтервал [lower, upper), покрывающий дни start_date..end_date целиком."""
+    lower = pd.Timestamp(start_date).normalize()
+    upper = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+    return lower, upper
 
-def load_payments(path: str | Path) -> pd.DataFrame:
-    df = pd.read_csv(path)
-    df["paid_at"] = pd.to_datetime(df["paid_at"])
+
+def _sorted_by(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    df.sort_values(column, inplace=True, kind="stable")
+    df.reset_index(drop=True, inplace=True)
     return df
 
 
+def _read_events(
+    path: str | Path,
+    column: str,
+    dtypes: dict,
+    start_date: pd.Timestamp | None = None,
+    end_date: pd.Timestamp | None = None,
+) -> pd.DataFrame:
+    """
+    Читает CSV с событиями и сортирует по колонке времени column.
+
+    Если задан период, файл читается кусками по CHUNK_SIZE строк и в памяти
+    остаются только строки, попавшие в дни [start_date, end_date] — пиковое
+    потребление памяти определяется периодом, а не всей историей.
+    """
+    read_kwargs = dict(dtype=dtypes, parse_dates=[column], date_format=DATE_FORMAT)
+
+    if start_date is None or end_date is None:
+        df = pd.read_csv(path, **read_kwargs)
+    else:
+        lower, upper = _period_bounds(start_date, end_date)
+
+        parts = []
+        for chunk in pd.read_csv(path, chunksize=CHUNK_SIZE, **read_kwargs):
+            mask = (chunk[column] >= lower) & (chunk[column] < upper)
+            parts.append(chunk[mask])
+
+        if parts:
+            # Категории в разных кусках могут не совпадать — приводим типы заново
+            df = pd.concat(parts, ignore_index=True).astype(dtypes)
+        else:
+            df = pd.read_csv(path, nrows=0, **read_kwargs)
+
+    # На пустом CSV (только заголовок) parse_dates оставляет колонку object —
+    # приводим явно, на уже разобранной колонке это бесплатно
+    df[column] = pd.to_datetime(df[column], format=DATE_FORMAT)
+    return _sorted_by(df, column)
+
+
+def require_pyarrow(purpose: str) -> None:
+    """Проверяет, что установлен опциональный pyarrow; purpose — для чего он нужен."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            f"{purpose} нужен pyarrow: pip install -r requirements-optional.txt"
+        ) from exc
+
+
+def _cache_dataset_dir(path: Path, cache_dir: str | Path) -> Path:
+    # Хэш полного пути — чтобы одноимённые CSV из разных папок не делили кэш
+    path_hash = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:8]
+    return Path(cache_dir) / f"{path.stem}-{path_hash}"
+
+
+def _source_mtime(path: Path) -> str:
+    return str(path.stat().st_mtime_ns)
+
+
+def _cache_is_fresh(path: Path, dataset_dir: Path) -> bool:
+    marker = dataset_dir / _CACHE_MARKER
+    return marker.exists() and marker.read_text() == _source_mtime(path)
+
+
+def _read_events_cached(
+    path: str | Path,
+    column: str,
+    dtypes: dict,
+    cache_dir: str | Path,
+    start_date: pd.Timestamp | None = None,
+    end_date: pd.Timestamp | None = None,
+) -> pd.DataFrame:
+    """
+    То же, что _read_events, но через Parquet-кэш в cache_dir/<имя CSV>-<хэш пути>.
+
+    При первом запуске (или если CSV изменился) CSV читается целиком и
+    сохраняется в Parquet с партициями по году/месяцу column. Дальше читаются
+    только партиции и строки нужного периода. Требует pyarrow.
+    """
+    require_pyarrow("Для Parquet-кэша")
+
+    path = Path(path)
+    dataset_dir = _cache_dataset_dir(path, cache_dir)
+    has_period = start_date is not None and end_date is not None
+
+    if not _cache_is_fresh(path, dataset_dir):
+        df = _read_events(path, column, dtypes)
+        if df.empty:
+            return df
+
+        shutil.rmtree(dataset_dir, ignore_errors=True)
+        df.assign(year=df[column].dt.year, month=df[column].dt.month).to_parquet(
+            dataset_dir, partition_cols=PARTITION_COLS, index=False
+        )
+        (dataset_dir / _CACHE_MARKER).write_text(_source_mtime(path))
+
+        if not has_period:
+            return df
+        lower, upper = _period_bounds(start_date, end_date)
+        lo = df[column].searchsorted(lower, side="left")
+        hi = df[column].searchsorted(upper, side="left")
+        return df.iloc[lo:hi].reset_index(drop=True)
+
+    filters = None
+    if has_period:
+        lower, upper = _period_bounds(start_date, end_date)
+        # DNF: по одной группе условий на каждый (год, месяц) периода —
+        # pyarrow открывает только эти партиции и фильтрует в них строки
+        months = pd.period_range(lower, upper - pd.Timedelta(days=1), freq="M")
+        filters = [
+            [
+                ("year", "==", month.year),
+                ("month", "==", month.month),
+                (column, ">=", lower),
+                (column, "<", upper),
+            ]
+            for month in months
+        ]
+
+    df = pd.read_parquet(dataset_dir, filters=filters)
+    df = df.drop(columns=PARTITION_COLS).astype(dtypes)
+    return _sorted_by(df, column)
+
+
+def _scan_last_timestamp(
+    path: str | Path,
+    column: str,
+    cache_dir: str | Path | None = None,
+) -> pd.Timestamp | None:
+    """
+    Максимальное значение column без загрузки всей таблицы.
+
+    Читается только одна колонка: из актуального Parquet-кэша, если он есть,
+    иначе из CSV кусками по CHUNK_SIZE строк. None — если событий нет.
+    """
+    if cache_dir is not None:
+        path = Path(path)
+        dataset_dir = _cache_dataset_dir(path, cache_dir)
+        if _cache_is_fresh(path, dataset_dir):
+            require_pyarrow("Для Parquet-кэша")
+            last = pd.read_parquet(dataset_dir, columns=[column])[column].max()
+            return None if pd.isna(last) else last
+
+    last = None
+    for chunk in pd.read_csv(
+        path,
+        usecols=[column],
+        parse_dates=[column],
+        date_format=DATE_FORMAT,
+        chunksize=CHUNK_SIZE,
+    ):
+        chunk_last = pd.to_datetime(chunk[column], format=DATE_FORMAT).max()
+        if not pd.isna(chunk_last) and (last is None or chunk_last > last):
+            last = chunk_last
+    return last
+
+
+def scan_last_dates(
+    users_path: str | Path,
+    payments_path: str | Path,
+    cache_dir: str | Path | None = None,
+) -> List[pd.Timestamp]:
+    """
+    Последние моменты регистрации и оплаты (для таблиц, где есть события).
+
+    Нужны, чтобы определить период по умолчанию до загрузки данных и затем
+    читать только его.
+    """
+    last_dates = [
+        _scan_last_timestamp(users_path, "registered_at", cache_dir),
+        _scan_last_timestamp(payments_path, "paid_at", cache_dir),
+    ]
+    return [d for d in last_dates if d is not None]
+
+
+def _load(
+    path: str | Path,
+    column: str,
+    dtypes: dict,
+    start_date: pd.Timestamp | None,
+    end_date: pd.Timestamp | None,
+    cache_dir: str | Path | None,
+) -> pd.DataFrame:
+    if cache_dir is None:
+        return _read_events(path, column, dtypes, start_date, end_date)
+    return _read_events_cached(path, column, dtypes, cache_dir, start_date, end_date)
+
+
+def load_users(
+    path: str | Path,
+    start_date: pd.Timestamp | None = None,
+    end_date: pd.Timestamp | None = None,
+    cache_dir: str | Path | None = None,
+) -> pd.DataFrame:
+    return _load(path, "registered_at", USERS_DTYPES, start_date, end_date, cache_dir)
+
+
+def load_payments(
+    path: str | Path,
+    start_date: pd.Timestamp | None = None,
+    end_date: pd.Timestamp | None = None,
+    cache_dir: str | Path | None = None,
+) -> pd.DataFrame:
+    return _load(path, "paid_at", PAYMENTS_DTYPES, start_date, end_date, cache_dir)
+
+
 def load_all(
     users_path: str | Path,
     payments_path: str | Path,
+    start_date: pd.Timestamp | None = None,
+    end_date: pd.Timestamp | None = None,
+    cache_dir: str | Path | None = None,
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    users = load_users(users_path)
-    payments = load_payments(payments_path)
-    return users, payments
+    """
+    Загружает пользователей и платежи.
+
+    Если заданы start_date и end_date, загружаются только строки этого периода
+    (по дням включительно). Если задан cache_dir, CSV один раз конвертируются
+    в партиционированный Parquet и дальше читаются из него.
+    """
+    # Парсинг CSV в pandas отпускает GIL, поэтому два файла читаются параллельно
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        users_future = executor.submit(
+            load_users, users_path, start_date, end_date, cache_dir
+        )
+        payments_future = executor.submit(
+            load_payments, payments_path, start_date, end_date, cache_dir
+        )
+        return users_future.result(), payments_future.result()
@@ -2,7 +2,7 @@
 """
 Еженедельный KPI-отчёт:
 
-1. Загружает данные пользователей и платежей из CSV.
+1. Загружает данные пользователей и платежей за период из CSV.
 2. Считает дневные KPI и итог за период.
 3. Строит Excel-отчёт.
 4. (Опционально) отправляет краткое резюме + файл в Telegram.
@@ -27,8 +27,8 @@ import argparse
 import pandas as pd
 
 import config
-from loader import load_all
-from transform import compute_date_range, compute_kpis, summary_to_dict
+from loader import load_all, scan_last_dates
+from transform import compute_kpis, summary_to_dict, window_ending_at
 from report_builder import build_excel_report
 from notifier import send_telegram_message
 
@@ -80,11 +80,19 @@ def main():
     )
     parser.add_argument(
         "--start-date",
-        help="Дата начала периода (YYYY-MM-DD). Если не задана, берётся последняя неделя по данным.",
+        help=(
+            "Дата начала периода (YYYY-MM-DD). Если не задана, берётся последняя неделя "
+            "по данным. Из CSV читается только период отчёта, листы "
+            "raw_users/raw_payments содержат только его строки."
+        ),
     )
     parser.add_argument(
         "--end-date",
-        help="Дата окончания периода (YYYY-MM-DD). Если не задана, берётся последняя неделя по данным.",
+        help=(
+            "Дата окончания периода (YYYY-MM-DD). Если не задана, берётся последняя неделя "
+            "по данным. Из CSV читается только период отчёта, листы "
+            "raw_users/raw_payments содержат только его строки."
+        ),
     )
     parser.add_argument(
         "--output",
@@ -99,20 +107,29 @@ def main():
 
     args = parser.parse_args()
 
-    # 1. Загружаем данные
+    cache_dir = config.PARQUET_CACHE_DIR if config.ENABLE_PARQUET_CACHE else None
+
+    # 1. Определяем период — до загрузки, чтобы читать из CSV только его.
+    # По умолчанию это последняя неделя по данным: для поиска последней даты
+    # читаются только колонки времени.
+    if args.start_date is not None and args.end_date is not None:
+        start_date = pd.Timestamp(args.start_date).normalize()
+        end_date = pd.Timestamp(args.end_date).normalize()
+    else:
+        last_dates = scan_last_dates(args.users_csv, args.payments_csv, cache_dir)
+        if not last_dates:
+            print("Нет данных ни по пользователям, ни по платежам — отчёт не имеет смысла.")
+            return
+        start_date, end_date = window_ending_at(last_dates)
+    print(f"Период отчёта: {start_date.date().isoformat()} — {end_date.date().isoformat()}")
+
+    # 2. Загружаем данные за период. Пустые таблицы здесь значат лишь
+    # "нет событий за период" — такой отчёт (с нулевыми KPI) всё равно строим
     print(f"Загружаю пользователей из: {args.users_csv}")
     print(f"Загружаю платежи из: {args.payments_csv}")
-    users_df, payments_df = load_all(args.users_csv, args.payments_csv)
-
-    if users_df.empty and payments_df.empty:
-        print("Нет данных ни по пользователям, ни по платежам — отчёт не имеет смысла.")
-        return
-
-    # 2. Определяем период
-    start_date, end_date = compute_date_range(
-        users_df, payments_df, start_date=args.start_date, end_date=args.end_date
+    users_df, payments_df = load_all(
+        args.users_csv, args.payments_csv, start_date, end_date, cache_dir=cache_dir
     )
-    print(f"Период отчёта: {start_date.date().isoformat()} — {end_date.date().isoformat()}")
 
     # 3. Считаем KPI
     daily_df, summary = compute_kpis(users_df, payments_df, start_date, end_date)
@@ -10,9 +10,46 @@
 """
 
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# Общая сессия: sendMessage и sendDocument идут подряд на один хост,
+# keep-alive позволяет второму запросу переиспользовать TCP/TLS-соединение.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
+
+def _post_document(
+    url: str, chat_id: str, file_name: str, f: BinaryIO
+) -> requests.Response:
+    try:
+        from requests_toolbelt import MultipartEncoder
+    except ImportError:
+        # Без опционального requests-toolbelt — обычная загрузка через files=
+        # (requests соберёт всё тело запроса в памяти)
+        return _session.post(
+            url,
+            data={"chat_id": chat_id},
+            files={"document": (file_name, f)},
+            timeout=30,
+        )
+
+    # MultipartEncoder читает файл кусками прямо в сокет, а не собирает
+    # всё тело запроса в памяти, как files= в requests
+    encoder = MultipartEncoder(
+        fields={
+            "chat_id": str(chat_id),
+            "document": (file_name, f, "application/octet-stream"),
+        }
+    )
+    return _session.post(
+        url,
+        data=encoder,
+        headers={"Content-Type": encoder.content_type},
+        timeout=30,
+    )
 
 
 def send_telegram_message(
@@ -27,7 +64,7 @@ def send_telegram_message(
     base_url = f"https://api.telegram.org/bot{token}"
 
     # Сначала отправляем текст
-    resp = requests.post(
+    resp = _session.post(
         f"{base_url}/sendMessage",
         data={"chat_id": chat_id, "text": text, "parse_mode": "HTML"},
         timeout=15,
@@ -38,10 +75,5 @@ def send_telegram_message(
     if file_path is not None:
         file_path = Path(file_path)
         with file_path.open("rb") as f:
-            resp = requests.post(
-                f"{base_url}/sendDocument",
-                data={"chat_id": chat_id},
-                files={"document": (file_path.name, f)},
-                timeout=30,
-            )
+            resp = _post_document(f"{base_url}/sendDocument", chat_id, file_path.name, f)
         resp.raise_for_status()
@@ -5,6 +5,11 @@
   - raw_payments
   - daily_kpi
   - summary
+
+Если сырых данных больше RAW_SHEET_MAX_ROWS строк, вместо листа raw_*
+рядом с отчётом пишется Parquet-файл, а в summary — ссылка на него.
+Оставшийся от прошлых запусков такой файл удаляется, если таблица
+снова помещается в лист.
 """
 
 from pathlib import Path
@@ -12,6 +17,12 @@ from typing import Dict
 
 import pandas as pd
 
+from loader import require_pyarrow
+
+# Порог, после которого сырые данные не пишутся в Excel (лимит листа —
+# 1 048 576 строк, а запись таких листов — самая медленная часть отчёта)
+RAW_SHEET_MAX_ROWS = 500_000
+
 
 def build_excel_report(
     users_df: pd.DataFrame,
@@ -23,18 +34,39 @@ def build_excel_report(
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    summary_rows = []
-    for key, value in summary_dict.items():
-        summary_rows.append({"metric": key, "value": value})
-    summary_df = pd.DataFrame(summary_rows)
+    raw_sheets = {}
+    summary_dict = dict(summary_dict)
+    for sheet_name, df in (("raw_users", users_df), ("raw_payments", payments_df)):
+        parquet_path = output_path.with_name(f"{output_path.stem}_{sheet_name}.parquet")
+        if len(df) > RAW_SHEET_MAX_ROWS:
+            require_pyarrow(f"Для выгрузки таблиц больше {RAW_SHEET_MAX_ROWS} строк в Parquet")
+            df.to_parquet(parquet_path, index=False)
+            summary_dict[sheet_name] = parquet_path.name
+        else:
+            # Parquet от прошлого запуска с большими данными больше не актуален
+            parquet_path.unlink(missing_ok=True)
+            raw_sheets[sheet_name] = df
+
+    summary_df = pd.DataFrame(
+        {"metric": list(summary_dict.keys()), "value": list(summary_dict.values())}
+    )
 
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-        users_df.to_excel(writer, sheet_name="raw_users", index=False)
-        payments_df.to_excel(writer, sheet_name="raw_payments", index=False)
+    # xlsxwriter пишет файл потоково и заметно быстрее openpyxl.
+    # Режим constant_memory не включаем: pandas пишет ячейки по колонкам,
+    # а в этом режиме xlsxwriter молча теряет запись в уже сброшенные строки.
+    # strings_to_urls=False: не прогонять каждую строковую ячейку через
+    # regex-поиск URL — на raw-листах это основная часть времени записи строк.
+    with pd.ExcelWriter(
+        output_path,
+        engine="xlsxwriter",
+        engine_kwargs={"options": {"strings_to_urls": False}},
+    ) as writer:
+        for sheet_name, df in raw_sheets.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
         daily_df.to_excel(writer, sheet_name="daily_kpi", index=False)
         summary_df.to_excel(writer, sheet_name="summary", index=False)
 
-        # Здесь можно дополнительно через openpyxl добавить графики,
+        # Здесь можно дополнительно через xlsxwriter добавить графики,
         # стили форматирования и т.п. — оставим как будущий апгрейд.
 
     return output_path
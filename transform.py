@@ -6,10 +6,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
+import numpy as np
 import pandas as pd
 
+_ONE_DAY = np.timedelta64(1, "D")
+
 
 @dataclass
 class SummaryKPI:
@@ -47,14 +50,45 @@ def compute_date_range(
     if not payments.empty:
         all_dates.append(payments["paid_at"].max())
 
-    if not all_dates:
+    return window_ending_at(all_dates, window_days)
+
+
+def window_ending_at(
+    last_dates: List[pd.Timestamp],
+    window_days: int = 7,
+) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    Окно из window_days дней, заканчивающееся днём самого позднего из last_dates.
+    """
+    if not last_dates:
         raise ValueError("Невозможно определить диапазон дат: нет данных.")
 
-    last_date = max(all_dates).normalize()
-    first_date = last_date - pd.Timedelta(days=window_days - 1)
+    last_date = max(last_dates).normalize()
+    first_date = last_date - _ONE_DAY * (window_days - 1)
     return first_date, last_date
 
 
+def _slice_period(
+    df: pd.DataFrame,
+    column: str,
+    start_date: pd.Timestamp,
+    end_date: pd.Timestamp,
+) -> pd.DataFrame:
+    """
+    Возвращает строки df, где start_date <= df[column] <= end_date.
+
+    Ожидает df, отсортированный по column (так отдаёт loader) — тогда границы
+    находятся бинарным поиском без построения булевых масок. Неотсортированный
+    df сортируется здесь.
+    """
+    if not df[column].is_monotonic_increasing:
+        df = df.sort_values(column, kind="stable")
+
+    lo = df[column].searchsorted(start_date, side="left")
+    hi = df[column].searchsorted(end_date, side="right")
+    return df.iloc[lo:hi]
+
+
 def compute_kpis(
     users: pd.DataFrame,
     payments: pd.DataFrame,
@@ -69,80 +103,70 @@ def compute_kpis(
       - summary: SummaryKPI
     """
     # Фильтруем данные по диапазону
-    users_period = users[
-        (users["registered_at"] >= start_date) & (users["registered_at"] <= end_date)
-    ].copy()
-    payments_period = payments[
-        (payments["paid_at"] >= start_date) & (payments["paid_at"] <= end_date)
-    ].copy()
+    users_period = _slice_period(users, "registered_at", start_date, end_date)
+    payments_period = _slice_period(payments, "paid_at", start_date, end_date)
 
-    # Преобразуем даты к "дате без времени"
-    users_period["date"] = users_period["registered_at"].dt.normalize()
-    payments_period["date"] = payments_period["paid_at"].dt.normalize()
+    # Ключи группировки — "дата без времени"; в сами срезы колонку не добавляем,
+    # чтобы не копировать их
+    users_dates = users_period["registered_at"].dt.floor("D")
+    payments_dates = payments_period["paid_at"].dt.floor("D")
 
     # Диапазон дат по дням
     all_dates = pd.date_range(start_date, end_date, freq="D")
 
-    # Новые пользователи по дням
-    new_users_by_day = (
-        users_period.groupby("date")["user_id"].nunique().reindex(all_dates, fill_value=0)
-    )
-
-    # Платящие пользователи по дням (уникальные юзеры)
-    paying_users_by_day = (
-        payments_period.groupby("date")["user_id"].nunique().reindex(all_dates, fill_value=0)
-    )
-
-    # Кол-во платежей по дням
-    payments_count_by_day = (
-        payments_period.groupby("date")["payment_id"].nunique().reindex(all_dates, fill_value=0)
-    )
-
-    # Выручка по дням
-    revenue_by_day = (
-        payments_period.groupby("date")["amount"].sum().reindex(all_dates, fill_value=0.0)
+    # Группировки по дням строим один раз и переиспользуем для всех метрик
+    users_by_date = users_period.groupby(users_dates, sort=True)
+    payments_by_date = payments_period.groupby(payments_dates, sort=True)
+
+    # Все дневные метрики в одной таблице: новые пользователи + платящие,
+    # кол-во платежей, выручка и средний чек (за один проход по платежам).
+    # Дни без событий заполняются нулями после единственного reindex.
+    by_day = (
+        pd.concat(
+            [
+                users_by_date["user_id"].nunique().rename("new_users"),
+                payments_by_date.agg(
+                    paying_users=("user_id", "nunique"),
+                    payments_count=("payment_id", "size"),
+                    revenue=("amount", "sum"),
+                    avg_check=("amount", "mean"),
+                ),
+            ],
+            axis=1,
+        )
+        .reindex(all_dates)
+        .fillna(0)
     )
+    new_users_arr = by_day["new_users"].to_numpy(dtype="int64")
+    paying_users_arr = by_day["paying_users"].to_numpy(dtype="int64")
+    payments_count_arr = by_day["payments_count"].to_numpy(dtype="int64")
+    revenue_arr = by_day["revenue"].to_numpy(dtype=float)
+    avg_check_arr = by_day["avg_check"].to_numpy(dtype=float)
 
     # Конверсия по дням: платящие / новые (по зарегистрированным в этот же день)
-    conversion_by_day = []
-    for d in all_dates:
-        new_u = new_users_by_day.loc[d]
-        pay_u = paying_users_by_day.loc[d]
-        if new_u > 0:
-            conversion_by_day.append(pay_u / new_u)
-        else:
-            conversion_by_day.append(0.0)
-
-    conversion_by_day = pd.Series(conversion_by_day, index=all_dates)
-
-    # Средний чек по дням
-    avg_check_by_day = []
-    for d in all_dates:
-        mask = payments_period["date"] == d
-        day_payments = payments_period.loc[mask, "amount"]
-        if not day_payments.empty:
-            avg_check_by_day.append(day_payments.mean())
-        else:
-            avg_check_by_day.append(0.0)
-
-    avg_check_by_day = pd.Series(avg_check_by_day, index=all_dates)
+    conversion_arr = paying_users_arr.astype(float) / np.where(
+        new_users_arr > 0, new_users_arr, 1
+    )
+    conversion_arr[new_users_arr == 0] = 0.0
 
     daily_df = pd.DataFrame(
         {
-            "date": all_dates,
-            "new_users": new_users_by_day.values,
-            "paying_users": paying_users_by_day.values,
-            "payments_count": payments_count_by_day.values,
-            "revenue": revenue_by_day.values,
-            "conversion": conversion_by_day.values,  # доля
-            "avg_check": avg_check_by_day.values,
+            "date": all_dates.to_numpy(),
+            "new_users": new_users_arr,
+            "paying_users": paying_users_arr,
+            "payments_count": payments_count_arr,
+            "revenue": revenue_arr,
+            "conversion": conversion_arr,  # доля
+            "avg_check": avg_check_arr,
         }
     )
 
     # Агрегированный итог
-    total_new_users = int(new_users_by_day.sum())
-    total_paying_users = int(payments_period["user_id"].nunique())
-    total_revenue = float(revenue_by_day.sum())
+    total_new_users = int(new_users_arr.sum())
+    # Уникальные плательщики: на отсортированных id это число "смен" значения + 1
+    user_ids = np.sort(payments_period["user_id"].to_numpy())
+    total_paying_users = int((np.diff(user_ids) != 0).sum()) + 1 if user_ids.size else 0
+    total_revenue = float(revenue_arr.sum())
     avg_check_overall = (
         float(payments_period["amount"].mean()) if not payments_period.empty else None
     )